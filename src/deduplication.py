@@ -0,0 +1,161 @@
+# Near-Duplicate Detection Script
+# This script loads 'dataset.csv' (output of scraper.py), finds cross-posts and
+# reposts with MinHash signatures + LSH banding, and assigns every post a cluster ID.
+# topic-modeling.py then embeds one representative per cluster, and downstream
+# scores are fanned back out to the duplicates through 'cluster_id'.
+
+import pandas as pd
+import numpy as np
+import re
+import zlib
+import os
+
+# --- 1. Configuration ---
+DATA_FILE = "dataset.csv"
+CLUSTERS_FILE = "dataset_clusters.csv"  # Every post + cluster_id / is_representative
+DEDUP_FILE = "dataset_dedup.csv"        # One representative per cluster
+
+SHINGLE_SIZE = 3          # Word n-grams per shingle
+NUM_PERM = 128            # MinHash signature length
+NUM_BANDS = 16            # LSH bands (NUM_PERM / NUM_BANDS = 8 rows per band)
+JACCARD_THRESHOLD = 0.8   # Minimum estimated similarity to merge a candidate pair
+SEED = 42
+
+ROWS_PER_BAND = NUM_PERM // NUM_BANDS
+assert ROWS_PER_BAND * NUM_BANDS == NUM_PERM, "NUM_PERM must be divisible by NUM_BANDS"
+
+# --- 2. Shingling ---
+def normalize_text(text):
+    if not isinstance(text, str):
+        return ""
+    text = text.lower()
+    # Collapse each URL to one 'host_path' token, e.g. https://arxiv.org/abs/1 -> arxiv_org_abs_1
+    text = re.sub(r'https?://(\S+)', lambda m: ' ' + re.sub(r'\W+', '_', m.group(1)).strip('_') + ' ', text)
+    text = re.sub(r'[^\w\s]', ' ', text)
+    return ' '.join(text.split())
+
+def shingle_hashes(text):
+    """
+    Returns the unique 32-bit hashes of the word shingles of a document.
+    Very short posts (fewer words than SHINGLE_SIZE) become a single shingle,
+    so they only match exact (normalized) copies of themselves. Each URL is kept
+    as a single host + path token, so short link posts that differ only in their
+    link (e.g. "New paper http://a" vs "New paper http://b") do not match. Posts
+    with no words at all (emoji-only, punctuation-only) return no hashes and
+    are kept out of LSH, since they carry nothing to compare.
+    """
+    words = normalize_text(text).split()
+    if not words:
+        return np.array([], dtype=np.uint64)
+    if len(words) < SHINGLE_SIZE:
+        shingles = [' '.join(words)]
+    else:
+        shingles = [' '.join(words[i:i+SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)]
+    # crc32 is stable across runs, unlike Python's salted hash()
+    return np.unique(np.array([zlib.crc32(s.encode('utf-8')) for s in shingles], dtype=np.uint64))
+
+# --- 3. MinHash Signatures ---
+# Multiply-shift hashing: h(x) = ((a * x + b) mod 2^64) >> 32, with odd 'a'.
+# uint64 arithmetic wraps around, which gives the mod 2^64 for free.
+rng = np.random.default_rng(SEED)
+hash_a = rng.integers(1, 2**63, size=NUM_PERM, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+hash_b = rng.integers(0, 2**63, size=NUM_PERM, dtype=np.uint64)
+
+def minhash_signature(hashes):
+    if len(hashes) == 0:
+        return np.zeros(NUM_PERM, dtype=np.uint32)  # Placeholder, never bucketed
+    permuted = (hashes[:, None] * hash_a[None, :] + hash_b[None, :]) >> np.uint64(32)
+    return permuted.min(axis=0).astype(np.uint32)
+
+# --- 4. LSH Banding + Union-Find ---
+def find(parent, i):
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]  # Path halving
+        i = parent[i]
+    return i
+
+def cluster_signatures(signatures, has_shingles):
+    """
+    Buckets each signature band; documents sharing any bucket are candidate pairs.
+    Candidates are only merged if their estimated Jaccard similarity passes the
+    threshold, so each document is compared with its bucket-mates, not the corpus.
+    Documents without shingles are never bucketed and stay in their own cluster.
+
+    Union-find merges are transitive: if A~B and B~C pass the threshold, A and C
+    share a cluster even when J(A, C) < JACCARD_THRESHOLD, so clusters can chain.
+    """
+    n_docs = len(signatures)
+    parent = list(range(n_docs))
+    candidate_pairs = 0
+
+    for band in range(NUM_BANDS):
+        band_rows = signatures[:, band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND]
+        buckets = {}
+        for doc_idx, key in enumerate(map(bytes, band_rows)):
+            if not has_shingles[doc_idx]:
+                continue
+            buckets.setdefault(key, []).append(doc_idx)
+
+        for members in buckets.values():
+            if len(members) < 2:
+                continue
+            # Compare every pair in the bucket (buckets are small), skipping pairs
+            # that earlier merges have already put in the same cluster
+            for pos, other in enumerate(members[1:], start=1):
+                for earlier in members[:pos]:
+                    root_a, root_b = find(parent, earlier), find(parent, other)
+                    if root_a == root_b:
+                        continue
+                    candidate_pairs += 1
+                    similarity = np.mean(signatures[earlier] == signatures[other])
+                    if similarity >= JACCARD_THRESHOLD:
+                        parent[max(root_a, root_b)] = min(root_a, root_b)
+
+    print(f"Checked {candidate_pairs} candidate pairs across {NUM_BANDS} bands.")
+    return np.array([find(parent, i) for i in range(n_docs)])
+
+# --- 5. Main Pipeline ---
+def deduplicate():
+    if not os.path.exists(DATA_FILE):
+        print(f"Error: {DATA_FILE} not found.")
+        print("Please run 'scraper.py' first to generate the data.")
+        return
+
+    print(f"Loading raw dataset from {DATA_FILE}...")
+    df = pd.read_csv(DATA_FILE)
+    df = df.dropna(subset=['document'])
+    df = df[df['document'].str.strip() != '']
+    # Oldest post first, so the original (not the cross-post) becomes the representative
+    df = df.sort_values('created_utc', kind='stable').reset_index(drop=True)
+    print(f"Loaded {len(df)} documents.")
+
+    print(f"Computing MinHash signatures ({NUM_PERM} permutations)...")
+    doc_hashes = [shingle_hashes(doc) for doc in df['document']]
+    has_shingles = np.array([len(hashes) > 0 for hashes in doc_hashes])
+    signatures = np.vstack([minhash_signature(hashes) for hashes in doc_hashes])
+    print(f"{(~has_shingles).sum()} documents have no word tokens and are kept as singletons.")
+
+    print(f"Running LSH ({NUM_BANDS} bands x {ROWS_PER_BAND} rows, threshold {JACCARD_THRESHOLD})...")
+    roots = cluster_signatures(signatures, has_shingles)
+
+    # The root is always the lowest index in its cluster, i.e. the oldest post
+    df['cluster_id'] = pd.factorize(roots)[0]
+    df['is_representative'] = roots == np.arange(len(df))
+    df['cluster_size'] = df.groupby('cluster_id')['cluster_id'].transform('size')
+
+    n_clusters = df['cluster_id'].nunique()
+    n_duplicates = len(df) - n_clusters
+    print("\n================RESULTS================")
+    print(f"Documents: {len(df)}")
+    print(f"Clusters (unique documents): {n_clusters}")
+    print(f"Near-duplicates removed: {n_duplicates} ({n_duplicates / max(len(df), 1):.2%})")
+    print("\nDuplicates by subreddit:")
+    print(df[~df['is_representative']]['subreddit'].value_counts().head(10))
+
+    df.to_csv(CLUSTERS_FILE, index=False, encoding='utf-8-sig')
+    print(f"Saved cluster assignments for all posts to {CLUSTERS_FILE}")
+    df[df['is_representative']].to_csv(DEDUP_FILE, index=False, encoding='utf-8-sig')
+    print(f"Saved {n_clusters} representative posts to {DEDUP_FILE}")
+
+if __name__ == "__main__":
+    deduplicate()
@@ -0,0 +1,215 @@
+# Emotion Time-Series Cube Script
+# This script joins per-post emotion scores with 'subreddit', 'created_utc' and the
+# BERTopic topic id (document_topics.csv from topic-modeling.py), and rolls them up
+# into a pre-aggregated cube: one cell per (subreddit, topic, week) holding sums,
+# counts and a fixed-bin histogram per emotion. Means and approximate medians for
+# any slice are then answered from the cube, without re-inference or re-scanning posts.
+
+import pandas as pd
+import numpy as np
+import os
+
+# --- 1. Configuration ---
+DATA_FILE = "dataset.csv"                  # Text of every post, keyed by 'id'
+TOPICS_FILE = "document_topics.csv"        # Output of topic-modeling.py
+SCORES_FILE = "document_emotions.csv"      # Per-post scores (cached inference)
+CUBE_FILE = "emotion_cube.csv"             # Cell keys + sums / counts
+HIST_FILE = "emotion_cube_hist.npz"        # Per-cell histograms, row-aligned with CUBE_FILE
+
+# Same hypothesis buckets as emotion-analysis.py
+EMOTION_BUCKETS = {
+    'Anxiety': ['fear', 'nervousness'],
+    'Curiosity': ['curiosity'],
+    'Confusion': ['confusion'],
+    'Neutral': ['neutral'],
+    'Optimism': ['optimism', 'approval'],
+    'Sadness': ['sadness', 'disappointment']
+}
+CUBE_KEYS = ['subreddit', 'topic', 'week']
+BINS_PER_UNIT = 100  # Histogram resolution: medians are accurate to 1 / BINS_PER_UNIT
+
+# --- 2. Per-Post Emotion Scores ---
+def score_documents(docs, batch_size=32):
+    """
+    Runs GoEmotions once per post and returns one column per emotion bucket.
+    """
+    # Imported here so that building and querying a cached cube never loads the model
+    import torch
+    from transformers import pipeline
+    from tqdm import tqdm
+
+    device = 0 if torch.cuda.is_available() else -1
+    print(f"Loading GoEmotions Classifier on device: {device}...")
+    emotion_classifier = pipeline(
+        "text-classification",
+        model="SamLowe/roberta-base-go_emotions",
+        top_k=None,
+        device=device,
+        truncation=True,
+        max_length=512
+    )
+
+    rows = []
+    for i in tqdm(range(0, len(docs), batch_size)):
+        results = emotion_classifier(docs[i:i+batch_size])
+        for res in results:
+            scores = {item['label']: item['score'] for item in res}
+            rows.append({bucket: sum(scores.get(label, 0) for label in labels)
+                         for bucket, labels in EMOTION_BUCKETS.items()})
+    return pd.DataFrame(rows)
+
+def load_document_emotions(doc_topics):
+    """
+    Returns per-post emotion scores for every post in document_topics.csv.
+    Only cluster representatives are scored; near-duplicates inherit their scores.
+    Cached scores are reused per post 'id', so re-running deduplication.py or
+    topic-modeling.py only triggers inference for representatives not yet scored.
+    """
+    rep_ids = doc_topics.loc[doc_topics['is_representative'], 'id']
+
+    if os.path.exists(SCORES_FILE):
+        print(f"Loading cached emotion scores from {SCORES_FILE}...")
+        cached_scores = pd.read_csv(SCORES_FILE)
+    else:
+        cached_scores = pd.DataFrame(columns=['id', *EMOTION_BUCKETS])
+
+    missing_ids = rep_ids[~rep_ids.isin(cached_scores['id'])]
+    if len(missing_ids) > 0:
+        # The raw dataset holds every post, whichever dedup run picked the representatives
+        df = pd.read_csv(DATA_FILE)
+        df = df[df['id'].isin(missing_ids)].dropna(subset=['document'])
+        not_found = missing_ids[~missing_ids.isin(df['id'])]
+        if len(not_found) > 0:
+            raise ValueError(
+                f"{len(not_found)} representative posts in {TOPICS_FILE} have no text in {DATA_FILE} "
+                f"(e.g. {not_found.iloc[0]}). Re-run 'deduplication.py' and 'topic-modeling.py' on the current dataset."
+            )
+        print(f"Scoring {len(df)} representative posts without cached scores from {DATA_FILE}...")
+
+        new_scores = score_documents(df['document'].astype(str).tolist())
+        new_scores.insert(0, 'id', df['id'].values)
+        cached_scores = pd.concat([cached_scores, new_scores], ignore_index=True) if len(cached_scores) else new_scores
+        cached_scores.to_csv(SCORES_FILE, index=False)
+        print(f"Saved emotion scores for {len(cached_scores)} posts to {SCORES_FILE}")
+
+    # Drop scores of posts that are no longer representatives, so each cluster has one row
+    rep_scores = cached_scores[cached_scores['id'].isin(rep_ids)]
+
+    # Fan out: every post takes the scores of its cluster representative
+    rep_scores = rep_scores.merge(doc_topics[['id', 'cluster_id']], on='id')
+    rep_scores = rep_scores.drop(columns='id')
+    return doc_topics.merge(rep_scores, on='cluster_id', how='inner')
+
+# --- 3. Build the Cube ---
+def build_cube(doc_emotions):
+    """
+    Aggregates per-post scores into (subreddit, topic, week) cells.
+    Sums, counts and histogram bins all add up, so any roll-up over the
+    cube (e.g. all topics, or a date range) is a sum over its cells.
+    """
+    doc_emotions = doc_emotions.copy()
+    timestamps = pd.to_datetime(doc_emotions['created_utc'], unit='s')
+    doc_emotions['week'] = timestamps.dt.to_period('W-SUN').dt.start_time.dt.strftime('%Y-%m-%d')
+
+    grouped = doc_emotions.groupby(CUBE_KEYS, sort=True)
+    cell_ids = grouped.ngroup().to_numpy()
+    n_cells = grouped.ngroups
+
+    aggregations = {'count': ('id', 'size'), 'n_representatives': ('is_representative', 'sum')}
+    aggregations.update({f"{emotion}_sum": (emotion, 'sum') for emotion in EMOTION_BUCKETS})
+    cube = grouped.agg(**aggregations).reset_index()
+
+    histograms = {}
+    for emotion, labels in EMOTION_BUCKETS.items():
+        # A bucket of k labels scores in [0, k]
+        n_bins = BINS_PER_UNIT * len(labels)
+        bin_idx = np.clip((doc_emotions[emotion].to_numpy() * BINS_PER_UNIT).astype(int), 0, n_bins - 1)
+        hist = np.zeros((n_cells, n_bins), dtype=np.int32)
+        np.add.at(hist, (cell_ids, bin_idx), 1)
+        histograms[emotion] = hist
+
+    return cube, histograms
+
+def save_cube(cube, histograms):
+    cube.to_csv(CUBE_FILE, index=False)
+    np.savez_compressed(HIST_FILE, **histograms)
+    print(f"Saved {len(cube)} cube cells to {CUBE_FILE} / {HIST_FILE}")
+
+def load_cube():
+    cube = pd.read_csv(CUBE_FILE)
+    with np.load(HIST_FILE) as data:
+        histograms = {emotion: data[emotion] for emotion in data.files}
+    return cube, histograms
+
+# --- 4. Query the Cube ---
+def histogram_median(hist):
+    """
+    Approximate median from binned counts, interpolating inside the median bin.
+    """
+    total = hist.sum()
+    if total == 0:
+        return np.nan
+    cumulative = np.cumsum(hist)
+    median_bin = np.searchsorted(cumulative, total / 2)
+    below = cumulative[median_bin - 1] if median_bin > 0 else 0
+    fraction = (total / 2 - below) / hist[median_bin]
+    return (median_bin + fraction) / BINS_PER_UNIT
+
+def query_cube(cube, histograms, emotion, subreddits=None, topics=None, by=('subreddit', 'week')):
+    """
+    Mean, count and approximate median of one emotion, grouped by any subset of
+    CUBE_KEYS, e.g. weekly anxiety per subreddit: query_cube(cube, hists, 'Anxiety',
+    subreddits=['AI_Agents', 'Futurology'], by=('subreddit', 'week')).
+    """
+    mask = np.ones(len(cube), dtype=bool)
+    if subreddits is not None:
+        mask &= cube['subreddit'].isin(subreddits).to_numpy()
+    if topics is not None:
+        mask &= cube['topic'].isin(topics).to_numpy()
+
+    cells = cube[mask]
+    hist = histograms[emotion][mask]
+    group_ids = cells.groupby(list(by), sort=True).ngroup().to_numpy()
+
+    result = cells.groupby(list(by), sort=True)[['count', f"{emotion}_sum"]].sum().reset_index()
+    result['mean'] = result[f"{emotion}_sum"] / result['count']
+
+    group_hist = np.zeros((len(result), hist.shape[1]), dtype=np.int64)
+    np.add.at(group_hist, group_ids, hist)
+    result['median'] = [histogram_median(h) for h in group_hist]
+
+    return result.drop(columns=f"{emotion}_sum")
+
+# --- 5. Main Pipeline ---
+def cube_is_fresh():
+    """
+    The cube is reusable only if it was saved after the topic assignments and
+    emotion scores it was built from; re-running upstream stages invalidates it.
+    """
+    if not (os.path.exists(CUBE_FILE) and os.path.exists(HIST_FILE)):
+        return False
+    built_at = min(os.path.getmtime(CUBE_FILE), os.path.getmtime(HIST_FILE))
+    sources = [f for f in (TOPICS_FILE, SCORES_FILE) if os.path.exists(f)]
+    return all(os.path.getmtime(f) <= built_at for f in sources)
+
+if __name__ == "__main__":
+    if cube_is_fresh():
+        print(f"Loading pre-aggregated cube from {CUBE_FILE}...")
+        cube, histograms = load_cube()
+    elif not os.path.exists(TOPICS_FILE):
+        print(f"Error: {TOPICS_FILE} not found.")
+        print("Please run 'topic-modeling.py' first to generate topic assignments.")
+        exit()
+    else:
+        if os.path.exists(CUBE_FILE):
+            print(f"{TOPICS_FILE} or {SCORES_FILE} changed since the cube was built. Rebuilding...")
+        doc_topics = pd.read_csv(TOPICS_FILE)
+        doc_emotions = load_document_emotions(doc_topics)
+        print(f"Building cube from {len(doc_emotions)} posts...")
+        cube, histograms = build_cube(doc_emotions)
+        save_cube(cube, histograms)
+
+    # Example: weekly anxiety in r/AI_Agents vs r/Futurology
+    weekly_anxiety = query_cube(cube, histograms, 'Anxiety', subreddits=['AI_Agents', 'Futurology'])
+    print("\n================WEEKLY ANXIETY================")
+    print(weekly_anxiety.pivot(index='week', columns='subreddit', values='mean').round(4))
@@ -1,7 +1,8 @@
 # BERTopic Script
 # This script loads 'dataset.csv', performs preprocessing non-destructively,
 # includes Chrome installation for Kaleido PDF exports, tunes BERTopic to reduce outliers,
-# and extracts raw posts for the top 12 topics.
+# extracts raw posts for the top 12 topics, and writes per-post topic assignments
+# (fanned out to near-duplicates when deduplication.py has been run).
 
 import pandas as pd
 from sentence_transformers import SentenceTransformer
@@ -31,15 +32,34 @@ print("Chrome installation complete.")
 
 # --- 1. Data Loading ---
 DATA_FILE = "/content/dataset.csv"
+DEDUP_FILE = "/content/dataset_dedup.csv"        # Output of deduplication.py (optional)
+CLUSTERS_FILE = "/content/dataset_clusters.csv"  # Output of deduplication.py (optional)
+
+# The dedup files are only usable if they were built from the current dataset.csv
+dedup_available = os.path.exists(DEDUP_FILE) and os.path.exists(CLUSTERS_FILE)
+dedup_is_fresh = dedup_available and (
+    not os.path.exists(DATA_FILE)
+    or min(os.path.getmtime(DEDUP_FILE), os.path.getmtime(CLUSTERS_FILE)) >= os.path.getmtime(DATA_FILE)
+)
 
-if not os.path.exists(DATA_FILE):
+if dedup_is_fresh:
+    # Embed one representative per near-duplicate cluster; topics are fanned out in Step 8
+    print(f"Loading deduplicated dataset from {DEDUP_FILE}...")
+    df = pd.read_csv(DEDUP_FILE)
+    df_clusters = pd.read_csv(CLUSTERS_FILE)
+elif os.path.exists(DATA_FILE):
+    if dedup_available:
+        print(f"{DEDUP_FILE} is older than {DATA_FILE}. Re-run 'deduplication.py' to skip cross-posts and reposts.")
+    else:
+        print(f"{DEDUP_FILE} not found. Run 'deduplication.py' first to skip cross-posts and reposts.")
+    print(f"Loading raw dataset from {DATA_FILE}...")
+    df = pd.read_csv(DATA_FILE)
+    df_clusters = None
+else:
     print(f"Error: {DATA_FILE} not found.")
     print("Please run 'reddit_data_collector.py' first to generate the data.")
     exit()
 
-print(f"Loading raw dataset from {DATA_FILE}...")
-df = pd.read_csv(DATA_FILE)
-
 df = df.dropna(subset=['document'])
 df = df[df['document'].str.strip() != '']
 
@@ -140,9 +160,26 @@ print("\nExtracting raw posts for the top 12 topics...")
 topic_info = topic_model.get_topic_info()
 top_12_topic_ids = topic_info.sort_values('Count', ascending=False).head(12).index.tolist()
 
+# Keep the post 'id' so per-document scores can be joined back to document_topics.csv
+doc_topics = pd.DataFrame({'id': df['id'].values, 'document': docs, 'topic': topics})
+
 for topic_id in top_12_topic_ids:
-    topic_docs = [doc for tid, doc in zip(topics, docs) if tid == topic_id]
-    topic_df = pd.DataFrame({'document': topic_docs})
+    topic_df = doc_topics[doc_topics['topic'] == topic_id][['id', 'document']]
     topic_filename = f"topic_{topic_id}_posts.csv"
     topic_df.to_csv(topic_filename, index=False)
-    print(f"Saved {len(topic_docs)} posts to {topic_filename}")
+    print(f"Saved {len(topic_df)} posts to {topic_filename}")
+
+# --- 8. Fan Out Topics to Near-Duplicates ---
+# Every post (duplicates included) gets the topic of its cluster representative.
+# Only representatives are written to the topic CSVs above, so they are scored once.
+if df_clusters is not None:
+    print("\nFanning out topic assignments to near-duplicate posts...")
+    rep_topics = df_clusters[['id', 'cluster_id']].merge(doc_topics[['id', 'topic']], on='id')
+    all_topics = df_clusters.merge(rep_topics[['cluster_id', 'topic']], on='cluster_id', how='left')
+else:
+    all_topics = df.assign(cluster_id=range(len(df)), is_representative=True, topic=topics)
+
+all_topics['topic'] = all_topics['topic'].fillna(-1).astype(int)
+all_topics = all_topics[['id', 'subreddit', 'created_utc', 'cluster_id', 'is_representative', 'topic']]
+all_topics.to_csv("document_topics.csv", index=False)
+print(f"Saved topic assignments for {len(all_topics)} posts to document_topics.csv")